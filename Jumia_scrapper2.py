@@ -1,11 +1,26 @@
 import pandas as pd
-from playwright.sync_api import sync_playwright
-import time
+import numpy as np
+from numba import njit
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import ahocorasick
+import hishel
+import httpx
+from hishel.httpx import AsyncCacheTransport
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from selectolax.lexbor import LexborHTMLParser
+import asyncio
+import contextlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import random
 from datetime import datetime
 import re
 import logging
 import json
 import os
+import time
 
 # Set up logging
 logging.basicConfig(
@@ -18,11 +33,218 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Keep connections warm between listing pages so each GET skips the TCP/TLS handshake
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=30)
+
+# Longest shared pause (seconds) taken for one 429, whatever Retry-After asks for
+RATE_LIMIT_MAX_WAIT = 30
+# A rate-limited page is re-queued until it has been tried this many times, then counted as failed
+RATE_LIMIT_MAX_ATTEMPTS = 3
+
+# Listing pages in flight at once; fetching is I/O-bound, so match the connection pool rather than the CPU count
+FETCH_WORKERS = HTTP_LIMITS.max_connections
+
+# Development-only on-disk cache of listing HTML so repeat runs skip the network (enable with JUMIA_CACHE=1)
+HTTP_CACHE_FILE = '.jumia_cache/listings.db'
+HTTP_CACHE_TTL = 6 * 3600  # Seconds; prices change, so cached pages go stale quickly
+
+# Patterns are compiled once here rather than looked up on every product
+_PRICE_CLEAN_RE = re.compile(r'[^\d.]')
+_MODEL_STRIP_RE = re.compile(r'\b(?:Laptop|Smartphone|TV|Inch|GB|TB|RAM|SSD|HDD)\b', re.IGNORECASE)
+
+# Grouped selector for the article fields, matched in one walk of each article's subtree
+_ARTICLE_FIELDS_CSS = "a.core, h3.name, div.prc, div.old"
+
+# Below this many rows, starting worker processes costs more than enrichment itself
+PARALLEL_ENRICH_MIN_ROWS = 1000
+
+# Cookies (incl. the consent choice) persisted between browser sessions
+STORAGE_STATE_FILE = 'jumia_state.json'
+
+# Pooled browser pages are replaced after this many navigations to bound leaks
+PAGE_MAX_USES = 50
+
+class RateLimitedError(Exception):
+    """Raised when a listing fetch gets HTTP 429; the page is retried after the shared pause"""
+
+class CacheListingPages(hishel.BaseFilter):
+    """Cache filter that stores 200 responses with a product grid, whatever their cache headers say"""
+    
+    def needs_body(self):
+        return True
+    
+    def apply(self, item, body):
+        if item.status_code != 200:
+            return False
+        # The body may still be content-encoded; let httpx decode it as the client would.
+        # Pages without products (bot checks, past the last page) are left uncached
+        html = httpx.Response(200, headers=list(item.headers.items()), content=body).text
+        return LexborHTMLParser(html).css_first("article.prd") is not None
+
+def build_http_transport():
+    """Pooled HTTP/2 transport, wrapped in the on-disk listing cache when JUMIA_CACHE=1"""
+    transport = httpx.AsyncHTTPTransport(http2=True, limits=HTTP_LIMITS)
+    if os.environ.get('JUMIA_CACHE') != '1':
+        return transport
+    
+    return AsyncCacheTransport(
+        next_transport=transport,
+        storage=hishel.AsyncSqliteStorage(database_path=HTTP_CACHE_FILE, default_ttl=HTTP_CACHE_TTL),
+        policy=hishel.FilterPolicy(response_filters=[CacheListingPages()])
+    )
+
+# Requests the browser fallback never needs to read the product grid
+BLOCKED_RESOURCE_TYPES = ('image', 'media', 'font', 'stylesheet')
+BLOCKED_DOMAINS = ('google-analytics', 'googletag', 'facebook', 'doubleclick', 'hotjar')
+
+async def block_heavy_requests(route):
+    """Abort images, fonts, media, styles and trackers; let documents and XHR through"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(domain in request.url for domain in BLOCKED_DOMAINS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+class BrowserPool:
+    """Lazily started Chromium with a pool of warm pages, shared by all fallback fetches"""
+    
+    def __init__(self, playwright, size=5, max_uses=PAGE_MAX_USES, cdp_url=None):
+        self.playwright = playwright
+        self.size = size
+        self.max_uses = max_uses
+        self.cdp_url = cdp_url  # Attach to an already running Chromium instead of launching one
+        self.browser = None
+        self.context = None
+        self._pages = None  # Queue of (page, navigations served)
+        self._start_error = None  # Set when startup failed; later fallbacks fail fast
+        self._lock = asyncio.Lock()
+    
+    async def start(self):
+        """Launch the browser and open the page pool on first use"""
+        async with self._lock:
+            if self._pages is not None:
+                return
+            if self._start_error is not None:
+                raise RuntimeError(f"Browser fallback unavailable: {str(self._start_error)}")
+            
+            try:
+                if self.cdp_url:
+                    logger.info(f"🔌 Connecting to shared browser at {self.cdp_url}")
+                    self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_url)
+                else:
+                    logger.info("🚀 Launching browser for Playwright fallback")
+                    self.browser = await self.playwright.chromium.launch(headless=True)
+                
+                # Reuse cookies from the previous run when available
+                has_state = os.path.exists(STORAGE_STATE_FILE)
+                self.context = await self.browser.new_context(
+                    user_agent=USER_AGENT,
+                    viewport={'width': 1920, 'height': 1080},
+                    storage_state=STORAGE_STATE_FILE if has_state else None
+                )
+                self.context.set_default_timeout(30000)
+                await self.context.route("**/*", block_heavy_requests)
+                
+                # Open the page pool once; workers borrow a page and hand it back
+                pages = asyncio.Queue()
+                for _ in range(self.size):
+                    pages.put_nowait((await self.context.new_page(), 0))
+                
+                # Dismiss the cookie banner once per session, before any worker gets a page
+                if not has_state:
+                    page, uses = pages.get_nowait()
+                    await self.accept_cookies(page)
+                    pages.put_nowait((page, uses + 1))
+                
+                self._pages = pages
+            except Exception as e:
+                # Don't leave a half-started browser open, or launch a new one for every fallback page
+                self._start_error = e
+                logger.error(f"❌ Browser fallback failed to start: {str(e)}")
+                await self.close()
+                raise
+    
+    async def accept_cookies(self, page):
+        """Accept the cookie banner on the home page and save the resulting state"""
+        try:
+            await page.goto("https://www.jumia.ma", wait_until='domcontentloaded', timeout=30000)
+            await page.click("text=Accepter", timeout=2000)
+            await self.context.storage_state(path=STORAGE_STATE_FILE)
+            logger.info("🍪 Cookie banner accepted")
+        except Exception as e:
+            logger.info(f"No cookie banner handled: {str(e)}")
+    
+    @contextlib.asynccontextmanager
+    async def page(self):
+        """Borrow a pooled page for one navigation"""
+        await self.start()
+        page, uses = await self._pages.get()
+        try:
+            yield page
+        finally:
+            uses += 1
+            if uses >= self.max_uses:
+                # Swap in a fresh page; keep the old one if that fails so the pool never shrinks
+                try:
+                    fresh_page = await self.context.new_page()
+                except Exception as e:
+                    logger.warning(f"Could not recycle browser page: {str(e)}")
+                else:
+                    await page.close()
+                    page, uses = fresh_page, 0
+            self._pages.put_nowait((page, uses))
+    
+    async def close(self):
+        """Persist cookies and close the browser, if it was ever started"""
+        if self.browser is None:
+            return
+        browser, context = self.browser, self.context
+        self.browser = self.context = None
+        
+        # Teardown failures are only logged, so they never cost the scraped results
+        if context is not None:
+            try:
+                # Persist cookies so the next run starts with consent already given
+                await context.storage_state(path=STORAGE_STATE_FILE)
+            except Exception as e:
+                logger.warning(f"Could not save browser state: {str(e)}")
+        try:
+            # For a CDP connection this only drops our context and disconnects;
+            # the shared browser keeps running for other clients
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Could not close browser: {str(e)}")
+
+@njit(cache=True)
+def value_score_batch(prices, discounts):
+    """Compiled value score (0-100) kernel: one fused loop over the price/discount arrays"""
+    scores = np.empty_like(prices)
+    for i in range(prices.size):
+        # Discount bonus (0-30 points)
+        discount_bonus = min(discounts[i] * 0.6, 30.0)
+        
+        # Price factor (lower price = higher score for value)
+        if prices[i] < 1000:
+            price_bonus = 20.0
+        elif prices[i] < 3000:
+            price_bonus = 10.0
+        elif prices[i] < 5000:
+            price_bonus = 0.0
+        else:
+            price_bonus = -10.0
+        
+        total_score = 50.0 + discount_bonus + price_bonus
+        scores[i] = round(max(0.0, min(100.0, total_score)), 2)
+    return scores
+
 class EnhancedJumiaScraper:
     """Enhanced Jumia scraper for comprehensive market analysis"""
     
     def __init__(self):
-        self.products = []
+        self.products_df = None  # Enriched products, built once scraping is done
+        self._resume_at = 0.0  # time.monotonic() before which no worker may hit the site (429 backoff)
         self.categories_scraped = {}
         self.scraping_stats = {
             'start_time': datetime.now(),
@@ -69,14 +291,69 @@ class EnhancedJumiaScraper:
             'appliances': ['Samsung', 'LG', 'Whirlpool', 'Bosch', 'Electrolux'],
             'gaming': ['PlayStation', 'Xbox', 'Nintendo', 'Razer', 'Logitech']
         }
+        
+        # Price tier thresholds (MAD) per category
+        self.price_ranges = {
+            "ordinateurs-pc": {"budget": 3000, "premium": 10000},
+            "telephones-smartphones": {"budget": 2000, "premium": 6000},
+            "tv-home-cinema-lecteurs": {"budget": 2500, "premium": 8000},
+            "mlp-electromenager": {"budget": 1500, "premium": 5000},
+            "jeux-videos-consoles": {"budget": 1000, "premium": 4000}
+        }
+        self.default_price_range = {"budget": 1000, "premium": 5000}
+        
+        # Brand groups checked for each category, in priority order
+        category_brand_groups = {
+            'ordinateurs-pc': ['tech', 'gaming'],
+            'jeux-videos-consoles': ['tech', 'gaming'],
+            'telephones-smartphones': ['phones'],
+            'tv-home-cinema-lecteurs': ['tv'],
+            'mlp-electromenager': ['appliances']
+        }
+        
+        # Precompute uppercased brand tuples so extract_brand does no per-call setup
+        self._brand_map = {
+            category_key: tuple(brand.upper() for group in groups for brand in self.known_brands[group])
+            for category_key, groups in category_brand_groups.items()
+        }
+        # Fallback for unexpected categories: every known brand
+        self._all_brands_upper = tuple(dict.fromkeys(
+            brand.upper() for brand_list in self.known_brands.values() for brand in brand_list
+        ))
+        # Uppercased brand -> brand as written in known_brands
+        self._brand_names = {
+            brand.upper(): brand for brand_list in self.known_brands.values() for brand in brand_list
+        }
+        
+        # One Aho-Corasick automaton per category finds every brand in a single scan
+        self._brand_automata = {
+            category_key: self.build_brand_automaton(brands)
+            for category_key, brands in self._brand_map.items()
+        }
+        self._all_brands_automaton = self.build_brand_automaton(self._all_brands_upper)
+    
+    def build_brand_automaton(self, brands_upper):
+        """Build an automaton whose matches carry (priority, original brand name)"""
+        automaton = ahocorasick.Automaton()
+        for priority, brand_upper in enumerate(brands_upper):
+            automaton.add_word(brand_upper, (priority, self._brand_names[brand_upper]))
+        automaton.make_automaton()
+        return automaton
     
     # --- MODIFIED: Added max_pages_per_category argument ---
-    def scrape_all_categories(self, max_pages_per_category=None):
+    async def scrape_all_categories(self, max_pages_per_category=None, concurrency=5, workers=FETCH_WORKERS):
         """
         Main scraping method for all categories.
         
         :param max_pages_per_category: If an integer, overrides the default 'pages' 
                                        for all categories. If None, uses default pages.
+        :param concurrency: Size of the browser page pool used when a listing
+                            page has to fall back to Playwright.
+        :param workers: Number of fetch workers pulling (category, page) items
+                        off the shared queue.
+        
+        Set JUMIA_CDP_URL (e.g. http://127.0.0.1:9222) to run the fallback in an
+        already running Chromium instead of launching a new one.
         """
         logger.info("🚀 Starting enhanced Jumia scraping")
         
@@ -97,210 +374,352 @@ class EnhancedJumiaScraper:
         
         logger.info(f"Categories to scrape: {list(self.categories.keys())}")
         logger.info(f"Page limit set to: {max_pages_per_category if max_pages_per_category is not None else 'Default'}")
-        
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=False,  # Set to True for faster scraping
-                slow_mo=100
-            )
-            
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={'width': 1920, 'height': 1080}
-            )
-            
-            page = context.new_page()
-            page.set_default_timeout(30000)
-            
-            # Scrape each category using the active category list
-            for category_key, category_info in self.categories.items():
-                try:
-                    self.scrape_category(page, category_key, category_info)
-                    self.scraping_stats['categories_processed'] += 1
-                    
-                    # Log progress
-                    logger.info(f"✅ Completed {category_info['name']}: {self.categories_scraped[category_key]['products_found']} products")
-                    
-                    # Delay between categories
-                    time.sleep(5)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error scraping {category_key}: {str(e)}")
-                    self.scraping_stats['errors'] += 1
+        logger.info(f"Browser fallback pool size: {concurrency}")
+        
+        # Every (category, page) pair goes on one queue, so idle workers pick up
+        # pages from any category instead of waiting on a slow one
+        queue = asyncio.Queue()
+        page_results = {}
+        for key, info in self.categories.items():
+            logger.info(f"📦 Queued {info['name']} ({info['pages']} pages)")
+            page_results[key] = [None] * info['pages']
+            for page_num in range(1, info['pages'] + 1):
+                queue.put_nowait((key, page_num, 1))
+        
+        # One pooled HTTP client is shared by every fetch and closed when the run ends
+        async with async_playwright() as p, httpx.AsyncClient(
+            transport=build_http_transport(),
+            headers={'User-Agent': USER_AGENT},
+            timeout=30,
+            follow_redirects=True
+        ) as client:
+            # The browser is only started if a listing page needs the Playwright fallback
+            self._browser_pool = BrowserPool(p, size=concurrency, cdp_url=os.environ.get('JUMIA_CDP_URL'))
             
-            browser.close()
+            # Workers share the HTTP client and browser pool until the queue is drained
+            try:
+                await asyncio.gather(
+                    *[self.fetch_worker(client, queue, page_results) for _ in range(min(workers, queue.qsize()))]
+                )
+            finally:
+                await self._browser_pool.close()
+        
+        raw_products = []
+        for category_key, category_info in self.categories.items():
+            raw_products.extend(self.collect_category(category_key, category_info, page_results[category_key]))
+            self.scraping_stats['categories_processed'] += 1
+        
+        # Clean, score and number every product in one vectorized pass
+        self.products_df = self.build_products_frame(raw_products)
+        # Raw rows are not needed once the frame exists; drop every reference to them
+        # so they aren't carried through saving alongside the frame
+        del page_results, raw_products
+        
+        # Log progress
+        products_per_category = self.products_df['category_key'].value_counts()
+        for category_key, category_stats in self.categories_scraped.items():
+            category_stats['products_found'] = int(products_per_category.get(category_key, 0))
+            logger.info(f"✅ Completed {category_stats['name']}: {category_stats['products_found']} products")
         
         # Finalize and save data
         self.finalize_scraping()
         return self.save_data()
     
-    def scrape_category(self, page, category_key, category_info):
-        """Scrape a specific category"""
-        category_products = []
+    def scrape_all_categories_sync(self, max_pages_per_category=None, concurrency=5, workers=FETCH_WORKERS):
+        """Blocking wrapper around scrape_all_categories for scripts and the CLI"""
+        return asyncio.run(self.scrape_all_categories(max_pages_per_category, concurrency, workers))
+    
+    async def fetch_worker(self, client, queue, page_results):
+        """Fetch (category, page, attempt) items off the shared queue until it is empty"""
+        while True:
+            try:
+                category_key, page_num, attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            
+            category_name = self.categories[category_key]['name']
+            try:
+                page_results[category_key][page_num - 1] = await self.fetch_page(
+                    client, category_key, category_name, page_num
+                )
+            except RateLimitedError:
+                # Put the page back; it runs again once the shared pause is over
+                if attempt < RATE_LIMIT_MAX_ATTEMPTS:
+                    queue.put_nowait((category_key, page_num, attempt + 1))
+                else:
+                    logger.error(f"❌ Giving up on {category_key} page {page_num}: still rate limited after {attempt} attempts")
+                    self.scraping_stats['errors'] += 1
+    
+    async def wait_for_rate_limit(self):
+        """Hold the caller until any shared rate-limit pause has passed"""
+        while (delay := self._resume_at - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+    
+    def collect_category(self, category_key, category_info, page_results):
+        """Merge a category's fetched pages into its product list"""
         category_name = category_info['name']
-        pages_to_scrape = category_info['pages'] # This now holds the dynamic/default page count
-        
-        logger.info(f"📦 Starting {category_name} ({pages_to_scrape} pages)")
         
-        for page_num in range(1, pages_to_scrape + 1):
-            try:
-                url = f"https://www.jumia.ma/{category_key}/?page={page_num}"
-                logger.info(f"🔄 Scraping page {page_num}: {url}")
-                
-                # Navigate to page
-                page.goto(url, wait_until='domcontentloaded', timeout=60000)
-                page.wait_for_selector("article.prd", timeout=20000)
-                time.sleep(3)
-                
-                # Get product elements
-                product_containers = page.query_selector_all("article.prd")
-                logger.info(f"Found {len(product_containers)} products on page {page_num}")
-                
-                if not product_containers:
-                    logger.warning(f"No products found on page {page_num} - stopping category.")
-                    break # Break out of the page loop for this category
-                
-                # Process each product
-                page_products = self.process_products(product_containers, category_key, category_name)
-                category_products.extend(page_products)
-                
-                self.scraping_stats['pages_scraped'] += 1
-                time.sleep(2)  # Polite delay
-                
-            except Exception as e:
-                logger.error(f"Error scraping page {page_num} of {category_key}: {str(e)}")
-                self.scraping_stats['errors'] += 1
+        # Keep products in page order regardless of which page finished first,
+        # dropping listings repeated across pages (e.g. sponsored items); first one wins.
+        # The listing URL is the identity, so same-named variants are kept
+        category_products = []
+        seen_hrefs = set()
+        pages_scraped = 0
+        for page_products in page_results:
+            if page_products is None:
                 continue
+            for product in page_products:
+                href = product['href']
+                if href:
+                    if href in seen_hrefs:
+                        continue
+                    seen_hrefs.add(href)
+                category_products.append(product)
+            pages_scraped += 1
         
         # Store category results
         self.categories_scraped[category_key] = {
             'name': category_name,
-            'products_found': len(category_products),
-            'pages_scraped': page_num # Use the last successfully scraped page number
+            'products_found': len(category_products), # Updated once prices are cleaned
+            'pages_scraped': pages_scraped
         }
         
-        self.products.extend(category_products)
-        self.scraping_stats['total_products'] = len(self.products)
+        return category_products
     
-    def process_products(self, product_containers, category_key, category_name):
-        """Process individual products from containers"""
-        page_products = []
+    async def fetch_page(self, client, category_key, category_name, page_num):
+        """Fetch and process one listing page; returns None if the page failed"""
+        url = f"https://www.jumia.ma/{category_key}/?page={page_num}"
+        logger.info(f"🔄 Scraping page {page_num}: {url}")
         
-        for i, container in enumerate(product_containers):
-            try:
-                # Calculate product ID based on current total products + products on this page
-                current_product_count = len(self.products) + len(page_products)
-                product_data = self.extract_product_data(container, category_key, category_name, current_product_count + 1)
-                
-                if product_data:
-                    page_products.append(product_data)
-                    logger.info(f"✅ [{current_product_count + 1}] {product_data['product_name'][:50]}... - {product_data['current_price']} MAD")
-                
-            except Exception as e:
-                logger.error(f"Error processing product {i+1}: {str(e)}")
-                self.scraping_stats['errors'] += 1
-                continue
-        
-        return page_products
-    
-    def extract_product_data(self, container, category_key, category_name, product_index):
-        """Extract comprehensive product data"""
         try:
-            # Basic elements
-            name_elem = container.query_selector("h3.name")
-            price_elem = container.query_selector("div.prc")
-            old_price_elem = container.query_selector("div.old")
-            link_elem = container.query_selector("a.core")
-            # rating_elem = container.query_selector("div.stars") # unused
-            # reviews_elem = container.query_selector("div.rev") # unused
-            
-            # Extract basic data
-            product_name = name_elem.inner_text().strip() if name_elem else "N/A"
-            current_price = self.clean_price(price_elem.inner_text() if price_elem else "0")
-            original_price = self.clean_price(old_price_elem.inner_text() if old_price_elem else "0")
+            # Fast path: listing pages are server-rendered, so plain HTTP is enough
+            try:
+                raw_products = await self.fetch_listing(client, url)
+            except httpx.HTTPError as e:
+                logger.warning(f"HTTP fetch failed for {url}: {str(e)}")
+                raw_products = []
             
-            # Skip if no valid price
-            if current_price == 0:
-                return None
+            # Fallback: render the page in the browser
+            if not raw_products:
+                logger.info(f"🌐 Falling back to browser for {category_key} page {page_num}")
+                raw_products = await self.fetch_listing_browser(url)
             
-            # Extract additional data
-            brand = self.extract_brand(product_name, category_key)
-            model = self.extract_model(product_name, brand)
-            discount_percent = self.calculate_discount(current_price, original_price)
+            logger.info(f"Found {len(raw_products)} products on {category_key} page {page_num}")
             
-            # Build product URL
-            product_url = ""
-            if link_elem:
-                href = link_elem.get_attribute("href")
-                product_url = f"https://www.jumia.ma{href}" if href else ""
+            if not raw_products:
+                logger.warning(f"No products found on {category_key} page {page_num}")
+                return []
             
-            # Calculate derived metrics
-            price_tier = self.classify_price_tier(current_price, category_key)
-            value_score = self.calculate_value_score(current_price, original_price, discount_percent)
+            # Process each product
+            page_products = self.process_products(raw_products, category_key, category_name)
             
-            # Create product data
-            product_data = {
-                "product_id": f"JUM_{product_index:04d}", # Use passed index
-                "product_name": product_name,
-                "brand": brand,
-                "model": model,
-                "category": category_name,
-                "category_key": category_key,
-                "current_price": current_price,
-                "original_price": original_price if original_price > 0 else None,
-                "discount_percent": discount_percent,
-                "price_tier": price_tier,
-                "value_score": value_score,
-                "is_on_sale": discount_percent > 0,
-                "url": product_url,
-                "scraped_date": datetime.now().date(),
-                "scraped_time": datetime.now().strftime("%H:%M:%S"),
-                "scraped_timestamp": datetime.now().isoformat()
-            }
+            self.scraping_stats['pages_scraped'] += 1
             
-            return product_data
+            return page_products
             
+        except RateLimitedError:
+            # Not a reason to render the page (the browser would hit the same limit); fetch_worker re-queues it
+            raise
         except Exception as e:
-            logger.error(f"Error extracting product data: {str(e)}")
+            logger.error(f"Error scraping page {page_num} of {category_key}: {str(e)}")
+            self.scraping_stats['errors'] += 1
             return None
     
-    def clean_price(self, price_text):
-        """Clean and convert price to float"""
-        if not price_text:
-            return 0.0
+    async def fetch_listing(self, client, url):
+        """Fetch a listing page over HTTP and read the raw product fields"""
+        await self.wait_for_rate_limit()
+        response = await client.get(url)
+        
+        # Only slow down when the site asks us to: a 429 pauses every worker for
+        # Retry-After (capped), and the page is re-queued by fetch_worker
+        if response.status_code == 429:
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else random.uniform(1, 3)
+            delay = min(delay, RATE_LIMIT_MAX_WAIT)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            logger.warning(f"⏳ Rate limited on {url}, pausing all requests for {delay:.1f}s")
+            raise RateLimitedError(url)
+        
+        response.raise_for_status()
+        
+        return self.parse_listing(response.text)
+    
+    def parse_listing(self, html):
+        """Parse listing HTML locally and read the raw fields of every article.prd"""
+        tree = LexborHTMLParser(html)
+        return [self.parse_article(article) for article in tree.css("article.prd")]
+    
+    def parse_article(self, article):
+        """Read the raw text fields of one parsed article.prd node in a single walk"""
+        fields = {"name": "", "price": "", "old": "", "href": ""}
+        seen = set()
+        
+        for node in article.css(_ARTICLE_FIELDS_CSS):
+            if node.tag == "a":
+                field = "href"
+            elif node.tag == "h3":
+                field = "name"
+            else:
+                field = "old" if "old" in (node.attributes.get("class") or "").split() else "price"
+            
+            # First match per field wins, as with css_first
+            if field in seen:
+                continue
+            seen.add(field)
+            fields[field] = (node.attributes.get("href") or "") if field == "href" else node.text()
         
-        # Remove everything except digits, commas, and dots
-        cleaned = re.sub(r'[^\d,.]', '', price_text.strip())
-        cleaned = cleaned.replace(',', '')
+        return fields
+    
+    async def fetch_listing_browser(self, url):
+        """Render a listing page with Playwright and read the raw product fields"""
+        await self.wait_for_rate_limit()
+        async with self._browser_pool.page() as page:
+            # Navigate to page: stop waiting once the response commits, then wait for the grid
+            for attempt in range(2):
+                try:
+                    await page.goto(url, wait_until='commit', timeout=15000)
+                    await page.wait_for_selector("article.prd", state='attached', timeout=15000)
+                    break
+                except PlaywrightTimeoutError:
+                    if attempt == 1:
+                        raise
+                    logger.warning(f"Timed out loading {url}, retrying once")
+            
+            # Pull the rendered HTML once and parse it here, like the HTTP path
+            html = await page.content()
         
-        try:
-            return float(cleaned) if cleaned else 0.0
-        except ValueError:
-            return 0.0
+        return self.parse_listing(html)
+    
+    def process_products(self, raw_products, category_key, category_name):
+        """Tag raw listing fields with their category; enrichment happens after scraping"""
+        page_products = []
+        
+        # One timestamp per page keeps the date/time fields consistent across products
+        now = datetime.now()
+        stamp = (now.date(), now.strftime("%H:%M:%S"), now.isoformat())
+        
+        # Per-product lines are only formatted when INFO is actually enabled
+        log_products = logger.isEnabledFor(logging.INFO)
+        
+        for i, raw in enumerate(raw_products):
+            try:
+                product_data = self.extract_product_data(raw, category_key, category_name, stamp)
+                page_products.append(product_data)
+                if log_products:
+                    logger.info("✅ [%s] %.50s... - %s", category_key,
+                                product_data['product_name'], product_data['price_text'].strip())
+                
+            except Exception as e:
+                logger.error(f"Error processing product {i+1}: {str(e)}")
+                self.scraping_stats['errors'] += 1
+                continue
+        
+        return page_products
+    
+    def extract_product_data(self, raw, category_key, category_name, stamp):
+        """Build the raw product row kept until the vectorized enrichment pass"""
+        scraped_date, scraped_time, scraped_timestamp = stamp
+        return {
+            "product_name": raw["name"].strip() or "N/A",
+            "category": category_name,
+            "category_key": category_key,
+            "price_text": raw["price"],
+            "old_price_text": raw["old"],
+            "href": raw["href"],
+            "scraped_date": scraped_date,
+            "scraped_time": scraped_time,
+            "scraped_timestamp": scraped_timestamp
+        }
+    
+    def build_products_frame(self, raw_products):
+        """Clean, enrich and number the raw product rows as one DataFrame"""
+        workers = os.cpu_count() or 1
+        if len(raw_products) < PARALLEL_ENRICH_MIN_ROWS or workers < 2:
+            df = self.enrich_products(raw_products)
+        else:
+            # Large scrapes: enrich contiguous chunks on every CPU, then stitch back in order
+            chunk_size = -(-len(raw_products) // workers)
+            chunks = [raw_products[i:i + chunk_size] for i in range(0, len(raw_products), chunk_size)]
+            logger.info(f"⚙️ Enriching {len(raw_products)} products in {len(chunks)} processes")
+            
+            # Workers get this scraper's rules, so output doesn't depend on the row count
+            rules = self.enrichment_rules()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                df = pd.concat(executor.map(_enrich_chunk, chunks, itertools.repeat(rules)), ignore_index=True)
+        
+        # Number products in category/page order in one shot
+        df.insert(0, "product_id", [f"JUM_{index:04d}" for index in range(1, len(df) + 1)])
+        return df
+    
+    def enrichment_rules(self):
+        """Attributes enrich_products reads: price tiers and the brand lookup tables"""
+        return {
+            'price_ranges': self.price_ranges,
+            'default_price_range': self.default_price_range,
+            'known_brands': self.known_brands,
+            '_brand_map': self._brand_map,
+            '_all_brands_upper': self._all_brands_upper,
+            '_brand_names': self._brand_names,
+            '_brand_automata': self._brand_automata,
+            '_all_brands_automaton': self._all_brands_automaton
+        }
+    
+    def enrich_products(self, raw_products):
+        """Clean prices and derive brand, model, discount, tier and score for raw rows"""
+        raw = pd.DataFrame(raw_products, columns=[
+            "product_name", "category", "category_key", "price_text", "old_price_text", "href",
+            "scraped_date", "scraped_time", "scraped_timestamp"
+        ])
+        
+        # Clean prices and skip products without a valid price
+        raw["current_price"] = self.clean_prices(raw["price_text"])
+        raw["original_price"] = self.clean_prices(raw["old_price_text"])
+        raw = raw[raw["current_price"] > 0].reset_index(drop=True)
+        
+        current_price = raw["current_price"]
+        original_price = raw["original_price"]
+        
+        # Brand and model are string matching, done row by row
+        brands = [self.extract_brand(name, key) for name, key in zip(raw["product_name"], raw["category_key"])]
+        models = [self.extract_model(name, brand) for name, brand in zip(raw["product_name"], brands)]
+        
+        # Calculate derived metrics on whole columns
+        discount_percent = self.calculate_discounts(current_price, original_price)
+        
+        return pd.DataFrame({
+            "product_name": raw["product_name"],
+            "brand": brands,
+            "model": models,
+            "category": raw["category"],
+            "category_key": raw["category_key"],
+            "current_price": current_price,
+            "original_price": original_price.where(original_price > 0),
+            "discount_percent": discount_percent,
+            "price_tier": self.classify_price_tiers(current_price, raw["category_key"]),
+            "value_score": self.calculate_value_scores(current_price, discount_percent),
+            "is_on_sale": discount_percent > 0,
+            "url": ("https://www.jumia.ma" + raw["href"]).where(raw["href"] != "", ""),
+            "scraped_date": raw["scraped_date"],
+            "scraped_time": raw["scraped_time"],
+            "scraped_timestamp": raw["scraped_timestamp"]
+        })
+    
+    def clean_prices(self, price_texts):
+        """Clean and convert a Series of price strings to floats (0.0 when invalid)"""
+        # Remove everything except digits and dots (commas are thousands separators)
+        cleaned = price_texts.fillna("").astype(str).str.replace(_PRICE_CLEAN_RE, "", regex=True)
+        # to_numeric infers int64 for whole prices; keep the column float like the old float() parse
+        return pd.to_numeric(cleaned, errors="coerce").fillna(0.0).astype(float)
     
     def extract_brand(self, product_name, category_key):
         """Extract brand from product name based on category"""
-        product_upper = product_name.upper()
-        
         # Get relevant brands for category
-        if category_key in ['ordinateurs-pc', 'jeux-videos-consoles']:
-            brands_to_check = self.known_brands['tech'] + self.known_brands['gaming']
-        elif category_key == 'telephones-smartphones':
-            brands_to_check = self.known_brands['phones']
-        elif category_key == 'tv-home-cinema-lecteurs':
-            brands_to_check = self.known_brands['tv']
-        elif category_key == 'mlp-electromenager':
-            brands_to_check = self.known_brands['appliances']
-        else:
-            # Fallback for unexpected categories
-            brands_to_check = []
-            for brand_list in self.known_brands.values():
-                brands_to_check.extend(brand_list)
+        automaton = self._brand_automata.get(category_key, self._all_brands_automaton)
         
-        # Check for known brands
-        for brand in brands_to_check:
-            if brand.upper() in product_upper:
-                return brand
+        # Check for known brands; the earliest-listed brand wins if several match
+        match = min((value for _, value in automaton.iter(product_name.upper())), default=None)
+        if match:
+            return match[1]
         
         # Fallback: use first word
         first_word = product_name.split()[0] if product_name.split() else "Unknown"
@@ -312,65 +731,50 @@ class EnhancedJumiaScraper:
             return product_name[:100]
         
         # Remove brand and clean up
-        model = product_name.replace(brand, "").strip()
-        # Remove common words
-        common_words = ['Laptop', 'Smartphone', 'TV', 'Inch', 'GB', 'TB', 'RAM', 'SSD', 'HDD']
-        for word in common_words:
-            model = model.replace(word, "").replace(word.upper(), "").replace(word.lower(), "")
-        
-        return model.strip()[:100]
-    
-    def calculate_discount(self, current_price, original_price):
-        """Calculate discount percentage"""
-        if not original_price or original_price <= current_price:
-            return 0.0
-        return round(((original_price - current_price) / original_price) * 100, 2)
-    
-    def classify_price_tier(self, price, category_key):
-        """Classify price into tiers based on category"""
-        price_ranges = {
-            "ordinateurs-pc": {"budget": 3000, "premium": 10000},
-            "telephones-smartphones": {"budget": 2000, "premium": 6000},
-            "tv-home-cinema-lecteurs": {"budget": 2500, "premium": 8000},
-            "mlp-electromenager": {"budget": 1500, "premium": 5000},
-            "jeux-videos-consoles": {"budget": 1000, "premium": 4000}
-        }
-        
-        # Use key to look up ranges, falling back to a general range
-        ranges = price_ranges.get(category_key, {"budget": 1000, "premium": 5000})
-        
-        if price <= ranges["budget"]:
-            return "Budget"
-        elif price <= ranges["premium"]:
-            return "Mid-range"
-        else:
-            return "Premium"
+        model = product_name.replace(brand, "", 1).strip()
+        # Remove common words in a single pass
+        return _MODEL_STRIP_RE.sub("", model).strip()[:100]
     
-    def calculate_value_score(self, current_price, original_price, discount_percent):
-        """Calculate value score (0-100)"""
-        base_score = 50
-        
-        # Discount bonus (0-30 points)
-        discount_bonus = min(discount_percent * 0.6, 30)
-        
-        # Price factor (lower price = higher score for value)
-        if current_price < 1000:
-            price_bonus = 20
-        elif current_price < 3000:
-            price_bonus = 10
-        elif current_price < 5000:
-            price_bonus = 0
-        else:
-            price_bonus = -10
-        
-        total_score = base_score + discount_bonus + price_bonus
-        return round(max(0, min(100, total_score)), 2)
+    def calculate_discounts(self, current_prices, original_prices):
+        """Calculate discount percentages"""
+        # Plain NumPy float math and Python's round() per value reproduce the per-row results exactly;
+        # Series.round(2) and pandas' numexpr path can land 0.01 away on .xx5 ties (e.g. 47 vs 4000)
+        current, original = current_prices.to_numpy(dtype=np.float64), original_prices.to_numpy(dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw_discounts = (original - current) / original * 100
+        discounts = pd.Series([round(value, 2) for value in raw_discounts.tolist()], index=current_prices.index)
+        return discounts.where(original_prices > current_prices, 0.0)
+    
+    def classify_price_tiers(self, prices, category_keys):
+        """Classify prices into tiers based on category"""
+        # Threshold arrays indexed by category code; unknown keys get code -1,
+        # which picks the general range stored last
+        category_order = list(self.price_ranges)
+        budget_by_code = np.array([self.price_ranges[key]["budget"] for key in category_order] + [self.default_price_range["budget"]])
+        premium_by_code = np.array([self.price_ranges[key]["premium"] for key in category_order] + [self.default_price_range["premium"]])
+        codes = pd.Categorical(category_keys, categories=category_order).codes
+        
+        price_values = prices.to_numpy()
+        tiers = np.select(
+            [price_values <= budget_by_code[codes], price_values <= premium_by_code[codes]],
+            ["Budget", "Mid-range"],
+            default="Premium"
+        )
+        return pd.Series(tiers, index=prices.index)
+    
+    def calculate_value_scores(self, current_prices, discount_percents):
+        """Calculate value scores (0-100)"""
+        scores = value_score_batch(
+            current_prices.to_numpy(dtype=np.float64),
+            discount_percents.to_numpy(dtype=np.float64)
+        )
+        return pd.Series(scores, index=current_prices.index)
     
     def finalize_scraping(self):
         """Finalize scraping statistics"""
         self.scraping_stats['end_time'] = datetime.now()
         self.scraping_stats['duration'] = str(self.scraping_stats['end_time'] - self.scraping_stats['start_time'])
-        self.scraping_stats['total_products'] = len(self.products)
+        self.scraping_stats['total_products'] = len(self.products_df)
         
         logger.info("📊 SCRAPING COMPLETED!")
         logger.info(f"Total products: {self.scraping_stats['total_products']}")
@@ -381,36 +785,46 @@ class EnhancedJumiaScraper:
     
     def save_data(self):
         """Save data in multiple formats"""
-        if not self.products:
+        if self.products_df is None or self.products_df.empty:
             logger.warning("No products to save!")
             return None
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Convert to DataFrame
-        df = pd.DataFrame(self.products)
+        df = self.products_df
         
         # Add summary statistics
-        df_summary = self.generate_summary_stats(df)
+        data_summary = self.build_data_summary(df)
+        df_summary = self.generate_summary_stats(data_summary)
+        
+        # Convert to Arrow once; Parquet and CSV are both written from this table
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        
+        # Save Parquet (canonical output: smallest and fastest to reload for analysis)
+        parquet_filename = f"jumia_enhanced_data_{timestamp}.parquet"
+        pq.write_table(table, parquet_filename, compression='zstd')
+        logger.info(f"💾 Saved Parquet: {parquet_filename}")
         
-        # Save CSV
+        # Save CSV through PyArrow's C++ writer
         csv_filename = f"jumia_enhanced_data_{timestamp}.csv"
-        df.to_csv(csv_filename, index=False, encoding='utf-8')
+        pacsv.write_csv(table, csv_filename, write_options=pacsv.WriteOptions(batch_size=4096))
         logger.info(f"💾 Saved CSV: {csv_filename}")
         
         # Save Excel with multiple sheets
         excel_filename = f"jumia_enhanced_data_{timestamp}.xlsx"
-        with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
+        with pd.ExcelWriter(excel_filename, engine='xlsxwriter') as writer:
             df.to_excel(writer, sheet_name='Products', index=False)
             df_summary.to_excel(writer, sheet_name='Summary', index=False)
             
-            # Category breakdown
-            category_summary = df.groupby('category').agg({
-                'product_id': 'count',
-                'current_price': ['mean', 'min', 'max'],
-                'discount_percent': 'mean',
-                'value_score': 'mean'
-            }).round(2)
+            # Category breakdown in a single named-aggregation pass
+            category_summary = df.groupby('category').agg(
+                products=('product_id', 'size'),
+                price_mean=('current_price', 'mean'),
+                price_min=('current_price', 'min'),
+                price_max=('current_price', 'max'),
+                discount_mean=('discount_percent', 'mean'),
+                value_score_mean=('value_score', 'mean')
+            ).round(2)
             category_summary.to_excel(writer, sheet_name='Category_Analysis')
         
         logger.info(f"📊 Saved Excel: {excel_filename}")
@@ -420,15 +834,7 @@ class EnhancedJumiaScraper:
         stats_data = {
             'scraping_stats': self.scraping_stats,
             'categories_scraped': self.categories_scraped,
-            'data_summary': {
-                'total_products': len(df),
-                'categories': df['category'].nunique(),
-                'brands': df['brand'].nunique(),
-                'avg_price': float(df['current_price'].mean()),
-                'price_range': [float(df['current_price'].min()), float(df['current_price'].max())],
-                'products_on_sale': int(df['is_on_sale'].sum()),
-                'avg_discount': float(df[df['discount_percent'] > 0]['discount_percent'].mean() or 0)
-            }
+            'data_summary': data_summary
         }
         
         with open(stats_filename, 'w', encoding='utf-8') as f:
@@ -438,49 +844,71 @@ class EnhancedJumiaScraper:
         
         return df, csv_filename, excel_filename
     
-    def generate_summary_stats(self, df):
+    def build_data_summary(self, df):
+        """Compute overall dataset statistics, scanning each column once"""
+        price = df['current_price'].to_numpy()
+        discount = df['discount_percent'].to_numpy()
+        on_sale_mask = discount > 0
+        
+        return {
+            'total_products': len(df),
+            'categories': df['category'].nunique(),
+            'brands': df['brand'].nunique(),
+            'avg_price': float(price.mean()),
+            'price_range': [float(price.min()), float(price.max())],
+            'products_on_sale': int(on_sale_mask.sum()),
+            'avg_discount': float(discount[on_sale_mask].mean()) if on_sale_mask.any() else 0.0
+        }
+    
+    def generate_summary_stats(self, data_summary):
         """Generate summary statistics DataFrame"""
         summary_data = []
         
         # Overall stats
         summary_data.append({
             'Metric': 'Total Products',
-            'Value': len(df),
+            'Value': data_summary['total_products'],
             'Description': 'Total number of products scraped'
         })
         
         summary_data.append({
             'Metric': 'Categories',
-            'Value': df['category'].nunique(),
+            'Value': data_summary['categories'],
             'Description': 'Number of different categories'
         })
         
         summary_data.append({
             'Metric': 'Brands',
-            'Value': df['brand'].nunique(),
+            'Value': data_summary['brands'],
             'Description': 'Number of different brands'
         })
         
         summary_data.append({
             'Metric': 'Average Price (MAD)',
-            'Value': round(df['current_price'].mean(), 2),
+            'Value': round(data_summary['avg_price'], 2),
             'Description': 'Average product price'
         })
         
         summary_data.append({
             'Metric': 'Products on Sale',
-            'Value': int(df['is_on_sale'].sum()),
+            'Value': data_summary['products_on_sale'],
             'Description': 'Number of products with discounts'
         })
         
         summary_data.append({
             'Metric': 'Average Discount (%)',
-            'Value': round(df[df['discount_percent'] > 0]['discount_percent'].mean() or 0, 2),
+            'Value': round(data_summary['avg_discount'], 2),
             'Description': 'Average discount percentage (for discounted items)'
         })
         
         return pd.DataFrame(summary_data)
 
+def _enrich_chunk(raw_products, rules):
+    """Process-pool worker: enrich one chunk of raw rows with the calling scraper's rules"""
+    scraper = EnhancedJumiaScraper()
+    vars(scraper).update(rules)
+    return scraper.enrich_products(raw_products)
+
 # Usage
 if __name__ == "__main__":
     scraper = EnhancedJumiaScraper()
@@ -520,7 +948,7 @@ if __name__ == "__main__":
     print("\nStarting scraper...")
     
     # Run the scraper with the selected page count
-    result = scraper.scrape_all_categories(max_pages_per_category=PAGES_TO_SCRAPE)
+    result = scraper.scrape_all_categories_sync(max_pages_per_category=PAGES_TO_SCRAPE)
     
     if result:
         df, csv_file, excel_file = result